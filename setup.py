@@ -15,9 +15,12 @@ setup(
         "requests==2.20.0",
         "facebook-business==12.0.0",
         "backoff==1.8.0",
-        "cached-property==1.5.2",
         "pendulum==2.1.2"
     ],
+    extras_require={
+        # Faster RECORD message serialization, used automatically when present
+        "orjson": ["orjson"],
+    },
     entry_points="""
     [console_scripts]
     tap-instagram=tap_instagram:main
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
+import functools
 import json
 import os
 import sys
-from typing import Iterator
+from typing import Iterator, Tuple
+
+import pytz
 
 import singer
 from singer import Transformer, metrics, utils
@@ -10,6 +13,11 @@ from singer import metadata
 from singer.catalog import Catalog, CatalogEntry
 from singer.schema import Schema
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to singer's serializer
+    orjson = None
+
 from tap_instagram.api import InstagramAPI
 from tap_instagram.common import InstagramTapException
 from tap_instagram import streams as insta_streams
@@ -25,49 +33,151 @@ STREAM_CLS = {
     "stories": insta_streams.Stories,
     "story_insights": insta_streams.StoryInsights,
 }
+INCREMENTAL_STREAMS = frozenset(
+    name
+    for name, cls in STREAM_CLS.items()
+    if issubclass(cls, insta_streams.IncrementalStream)
+)
 
 
 def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
 
 
-def load_schemas():
-    """Load schemas from schemas folder"""
-    schemas = {}
-    for filename in os.listdir(get_abs_path("schemas")):
-        path = get_abs_path("schemas") + "/" + filename
-        file_raw = filename.replace(".json", "")
-        with open(path, "r", encoding="utf-8") as file:
-            schemas[file_raw] = json.load(file)
-    return schemas
+@functools.lru_cache(maxsize=None)
+def _load_schema_file(path):
+    """Parse a schema file once per process; repeat lookups hit the cache"""
+    return utils.load_json(path)
+
+
+def list_schema_names():
+    """List available schema names without parsing any schema file"""
+    with os.scandir(get_abs_path("schemas")) as entries:
+        return sorted(entry.name[: -len(".json")] for entry in entries if entry.name.endswith(".json"))
+
+
+def get_schema(name):
+    """Load the schema for a single stream, parsing it on first access only"""
+    return _load_schema_file(get_abs_path("schemas/{}.json".format(name)))
+
+
+# JSON schema scalar types and the sole python type the Transformer returns unchanged
+_PASSTHROUGH_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool}
+
+
+def build_passthrough_validator(schema):
+    """Precompute, per property, the python types the Transformer would pass through as-is.
+
+    Properties with formats, nested schemas or anyOf are left out so records
+    touching them always take the full transform path.
+    """
+    allowed = {}
+    for prop, sub_schema in schema.get("properties", {}).items():
+        if "format" in sub_schema or "anyOf" in sub_schema:
+            continue
+        types = sub_schema.get("type", [])
+        if isinstance(types, str):
+            types = [types]
+        accepted = []
+        for typ in types:
+            if typ == "null":
+                # The Transformer tries "null" last, so in boolean unions
+                # bool(None) wins first and None is coerced to False; keep
+                # those on the full transform path
+                if "boolean" in types:
+                    continue
+                accepted.append(type(None))
+            elif typ in _PASSTHROUGH_TYPES:
+                accepted.append(_PASSTHROUGH_TYPES[typ])
+            else:
+                break
+        else:
+            if accepted:
+                allowed[prop] = tuple(accepted)
+    return allowed
+
+
+def is_passthrough_record(record, allowed):
+    """True when transforming record against the schema would change nothing"""
+    for key, value in record.items():
+        types = allowed.get(key)
+        # Exact type match: bool is not an int here, and int is not a number.
+        # Empty strings are excluded because null-typed unions coerce them to None.
+        if types is None or type(value) not in types or value == "":
+            return False
+    return True
+
+
+class BufferedRecordWriter:
+    """Buffers formatted RECORD messages and writes stdout in batches.
+
+    singer.write_record flushes stdout after every message; for large streams
+    the flush syscalls dominate. Records are safe to buffer as long as the
+    buffer is drained before any STATE message and at stream end.
+    """
 
+    buffer_size = 100
 
-def load_schema_by_stream(stream):
-    path = get_abs_path("schemas/{}.json".format(stream.name))
-    schema = utils.load_json(path)
-    return schema
+    def __init__(self):
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def write_record(self, stream_name, record, stream_alias=None, time_extracted=None):
+        formatted = None
+        if orjson is not None:
+            # Build the message dict directly; RecordMessage + asdict only
+            # re-derive this exact shape
+            message = {"type": "RECORD", "stream": stream_alias or stream_name, "record": record}
+            if time_extracted:
+                message["time_extracted"] = utils.strftime(time_extracted.astimezone(pytz.utc))
+            try:
+                formatted = orjson.dumps(message).decode("utf-8")
+            except TypeError:
+                formatted = None  # types orjson can't serialize (e.g. Decimal) use simplejson
+        if formatted is None:
+            formatted = singer.messages.format_message(
+                singer.RecordMessage(
+                    stream=(stream_alias or stream_name),
+                    record=record,
+                    time_extracted=time_extracted,
+                )
+            )
+        self._buffer.append(formatted)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            sys.stdout.write("".join(message + "\n" for message in self._buffer))
+            sys.stdout.flush()
+            self._buffer.clear()
 
 
 def init_stream(api, catalog_entry, state) -> insta_streams.Stream:
     name = catalog_entry.stream
     stream_alias = catalog_entry.stream_alias
 
-    if name in STREAM_CLS:
-        stream_cls = STREAM_CLS[name]
-        if issubclass(stream_cls, insta_streams.IncrementalStream):
-            return stream_cls(
-                state, name=name, api=api, stream_alias=stream_alias, catalog_entry=catalog_entry
-            )
-        return stream_cls(name, api, stream_alias, catalog_entry)
-    raise InstagramTapException("Stream {} not available".format(name))
+    stream_cls = STREAM_CLS.get(name)
+    if stream_cls is None:
+        raise InstagramTapException("Stream {} not available".format(name))
+    if name in INCREMENTAL_STREAMS:
+        return stream_cls(
+            state, name=name, api=api, stream_alias=stream_alias, catalog_entry=catalog_entry
+        )
+    return stream_cls(name, api, stream_alias, catalog_entry)
 
 
 def discover():
-    raw_schemas = load_schemas()
     streams = []
-    for stream_id, schema in raw_schemas.items():
+    for stream_id in list_schema_names():
+        schema = get_schema(stream_id)
         stream_cls = STREAM_CLS[stream_id]
-        stream_metadata = metadata.to_list(metadata.to_map(metadata.get_standard_metadata(schema)))
+        stream_metadata = metadata.get_standard_metadata(schema)
         # Auto select all fields
         for item in stream_metadata:
             item["metadata"]["selected"] = True
@@ -85,11 +195,23 @@ def discover():
     return {"streams": streams}
 
 
-def get_selected_streams(api, catalog, state) -> Iterator[insta_streams.Stream]:
+def get_selected_streams(
+    api, catalog, state
+) -> Iterator[Tuple[CatalogEntry, insta_streams.Stream]]:
     for avail_stream in STREAM_CLS:
         catalog_entry = next((s for s in catalog.streams if s.tap_stream_id == avail_stream), None)
         if catalog_entry:
-            yield init_stream(api, catalog_entry, state)
+            yield catalog_entry, init_stream(api, catalog_entry, state)
+
+
+def get_entry_schema(catalog_entry):
+    """Prefer the schema already attached to the catalog entry, falling back to disk"""
+    schema = catalog_entry.schema
+    if isinstance(schema, Schema):
+        schema = schema.to_dict()
+    if schema and schema.get("properties"):
+        return schema
+    return get_schema(catalog_entry.stream)
 
 
 def sync(config, state, catalog: singer.Catalog):
@@ -98,9 +220,10 @@ def sync(config, state, catalog: singer.Catalog):
     LOGGER.info("State: %s", state)
     api = InstagramAPI(config["access_token"])
 
-    for stream in get_selected_streams(api, catalog, state):
+    for catalog_entry, stream in get_selected_streams(api, catalog, state):
         LOGGER.info("Syncing stream:%s", stream.name)
-        schema = load_schema_by_stream(stream)
+        schema = get_entry_schema(catalog_entry)
+        passthrough_types = build_passthrough_validator(schema)
         bookmark_properties = [stream.bookmark_key] if stream.bookmark_key else []
 
         singer.write_schema(
@@ -112,17 +235,21 @@ def sync(config, state, catalog: singer.Catalog):
         )
 
         with Transformer() as transformer:
-            with metrics.record_counter(stream.name) as counter:
+            with metrics.record_counter(stream.name) as counter, BufferedRecordWriter() as writer:
                 for message in stream:
                     # place type conversions or transformations here
                     if "record" in message:
                         counter.increment()
                         time_extracted = utils.now()
-                        record = transformer.transform(message["record"], schema)
-                        singer.write_record(
+                        record = message["record"]
+                        if not is_passthrough_record(record, passthrough_types):
+                            record = transformer.transform(record, schema)
+                        writer.write_record(
                             stream.name, record, stream.stream_alias, time_extracted
                         )
                     elif "state" in message:
+                        # Records must reach stdout before the state that covers them
+                        writer.flush()
                         singer.write_state(message["state"])
                     else:
                         raise InstagramTapException("Message invalid: {}".format(message))
@@ -139,7 +266,7 @@ def main():
         if args.catalog:
             catalog = args.catalog
         else:
-            catalog = discover()
+            catalog = Catalog.from_dict(discover())
         sync(args.config, args.state, catalog)
 
 
@@ -26,6 +26,10 @@ class InstagramExpectedError(InstagramAPIException):
     """Error that we expect to happen, we should continue reading without retrying failed query"""
 
 
+RETRYABLE_OAUTH_CODES = frozenset({1, 2, 4, 17, 341, 368})
+RATE_LIMIT_CODES = frozenset({4, 17, 32, 613})
+
+
 def retry_pattern(backoff_type, exception, **wait_gen_kwargs):
     def log_retry_attempt(details):
         _, exc, _ = sys.exc_info()
@@ -38,18 +42,11 @@ def retry_pattern(backoff_type, exception, **wait_gen_kwargs):
 
     def should_retry_api_error(exc: FacebookRequestError):
         # Retryable OAuth Error Codes
-        if exc.api_error_type() == "OAuthException" and exc.api_error_code() in (
-            1,
-            2,
-            4,
-            17,
-            341,
-            368,
-        ):
+        if exc.api_error_type() == "OAuthException" and exc.api_error_code() in RETRYABLE_OAUTH_CODES:
             return True
 
         # Rate Limiting Error Codes
-        if exc.api_error_code() in (4, 17, 32, 613):
+        if exc.api_error_code() in RATE_LIMIT_CODES:
             return True
 
         if exc.http_status() == status_codes.TOO_MANY_REQUESTS:  # pylint: disable=no-member
@@ -88,11 +85,11 @@ def retry_pattern(backoff_type, exception, **wait_gen_kwargs):
 
 def remove_params_from_url(url, params):
     parsed_url = urlparse.urlparse(url)
-    res_query = []
-    for query in parsed_url.query.split("&"):
-        key, value = query.split("=")
-        if key not in params:
-            res_query.append(f"{key}={value}")
-
-    parse_result = parsed_url._replace(query="&".join(res_query))
+    drop = frozenset(params)
+    res_query = [
+        (key, value)
+        for key, value in urlparse.parse_qsl(parsed_url.query, keep_blank_values=True)
+        if key not in drop
+    ]
+    parse_result = parsed_url._replace(query=urlparse.urlencode(res_query))
     return urlparse.urlunparse(parse_result)
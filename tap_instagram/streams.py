@@ -1,16 +1,46 @@
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from time import sleep
+
 import pendulum
 import singer
 from facebook_business.adobjects.igmedia import IGMedia
 from facebook_business.adobjects.instagraminsightsresult import InstagramInsightsResult
-from facebook_business.exceptions import FacebookRequestError
 
 from tap_instagram.api import InstagramAPI
-from tap_instagram.common import remove_params_from_url
+from tap_instagram.common import (
+    RATE_LIMIT_CODES,
+    InstagramAPIException,
+    remove_params_from_url,
+)
 
 LOGGER = singer.get_logger()
 
+# CDN cache-busting params stripped from media URLs so records stay stable across runs
+URL_TRACKING_PARAMS = frozenset({"_nc_sid", "_nc_cat", "ccb"})
+CLEANABLE_URL_KEYS = ("media_url", "profile_picture_url")
+
+# LRU of carousel child records keyed by (child_id, fields), shared across
+# streams and accounts within a process; children are immutable per run
+_CHILD_MEDIA_CACHE = OrderedDict()
+_CHILD_MEDIA_CACHE_SIZE = 2048
+_CHILD_MEDIA_CACHE_LOCK = threading.Lock()
+
 
 class Stream:
+    __slots__ = (
+        "name",
+        "_api",
+        "stream_alias",
+        "_catalog_entry",
+        "_fields",
+        "_automatic_fields",
+        "_metadata_map",
+    )
+
     base_properties = set()
     key_properties = []
     bookmark_key = None
@@ -18,6 +48,13 @@ class Stream:
     # Request params
     page_size = 100
 
+    # Concurrent per-account requests
+    max_workers = 4
+
+    # Attempts per Graph batch before giving up; waits follow the same
+    # expo/factor-5 progression as the backoff policy on single calls
+    max_batch_tries = 5
+
     def __init__(
         self,
         name: str,
@@ -29,34 +66,116 @@ class Stream:
         self._api = api
         self.stream_alias = stream_alias
         self._catalog_entry = catalog_entry
+        self._fields = None
+        self._automatic_fields = None
+        self._metadata_map = None
+
+    def metadata_map(self):
+        """Breadcrumb metadata map for the catalog entry, built once per instance"""
+        if self._metadata_map is None:
+            if self._catalog_entry:
+                self._metadata_map = singer.metadata.to_map(self._catalog_entry.metadata)
+            else:
+                self._metadata_map = {}
+        return self._metadata_map
 
     def automatic_fields(self):
-        fields = set()
-        if self._catalog_entry:
-            props = singer.metadata.to_map(self._catalog_entry.metadata)
-            for breadcrumb, data in props.items():
-                if len(breadcrumb) != 2:
-                    continue  # Skip root and nested metadata
-
-                if data.get("inclusion") == "automatic":
-                    fields.add(breadcrumb[1])
-        return fields.difference(self.base_properties)
+        """Fields with automatic inclusion; computed once per stream instance"""
+        if self._automatic_fields is None:
+            fields = {
+                breadcrumb[1]
+                for breadcrumb, data in self.metadata_map().items()
+                # Breadcrumbs of length 2 are fields; skip root and nested metadata
+                if len(breadcrumb) == 2 and data.get("inclusion") == "automatic"
+            }
+            self._automatic_fields = fields.difference(self.base_properties)
+        return self._automatic_fields
 
     def fields(self):
-        fields = set()
-        if self._catalog_entry:
-            props = singer.metadata.to_map(self._catalog_entry.metadata)
-            for breadcrumb, data in props.items():
-                if len(breadcrumb) != 2:
-                    continue  # Skip root and nested metadata
-
-                if data.get("selected") or data.get("inclusion") == "automatic":
-                    fields.add(breadcrumb[1])
-        return fields.difference(self.base_properties)
+        """Selected and automatic fields; computed once per stream instance"""
+        if self._fields is None:
+            fields = {
+                breadcrumb[1]
+                for breadcrumb, data in self.metadata_map().items()
+                # Breadcrumbs of length 2 are fields; skip root and nested metadata
+                if len(breadcrumb) == 2
+                and (data.get("selected") or data.get("inclusion") == "automatic")
+            }
+            self._fields = fields.difference(self.base_properties)
+        return self._fields
 
     def request_params(self):
         return {"limit": self.page_size}
 
+    def for_each_account(self, fetch):
+        """Run the fetch(account) generator across all accounts, yielding the
+        per-account record iterables in account order.
+
+        With a single account — the common case — the generator is consumed
+        lazily in the caller's thread, so records stream out as pages arrive.
+        With several accounts each generator is drained on the thread pool so
+        accounts fetch concurrently.
+        """
+        accounts = self._api.accounts
+        if len(accounts) == 1:
+            yield fetch(accounts[0])
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(accounts))) as executor:
+            yield from executor.map(lambda account: list(fetch(account)), accounts)
+
+    def execute_batch(self, objects, add_request):
+        """Execute one Graph batch of sub-requests with retries.
+
+        add_request(obj, batch, retry) must add obj's sub-request to batch and
+        call retry(obj, error) from its failure callback when the error is
+        retryable. Two failure modes are retried, both bounded by
+        max_batch_tries: sub-calls that got a null response (partial batch
+        timeouts, returned by batch.execute() as a new batch) and retryable
+        throttle/transient errors, which wait out the same expo backoff the
+        single-call policy applies before being re-sent.
+        """
+        last_error = None
+        for attempt in range(1, self.max_batch_tries + 1):
+            batch = self._api.api.new_batch()
+            retry_queue = []
+
+            def retry(obj, error):
+                retry_queue.append(obj)
+
+                nonlocal last_error
+                last_error = error
+
+            for obj in objects:
+                add_request(obj, batch, retry)
+
+            pending = batch.execute()
+            drain_tries = self.max_batch_tries
+            while pending is not None:
+                # execute() returns a batch of the sub-calls that received no
+                # response; they must be re-executed or their data is lost
+                drain_tries -= 1
+                if drain_tries <= 0:
+                    raise InstagramAPIException(
+                        "Graph batch requests still unanswered after {} tries".format(
+                            self.max_batch_tries
+                        )
+                    )
+                pending = pending.execute()
+
+            if not retry_queue:
+                return
+            objects = retry_queue
+            if attempt < self.max_batch_tries:
+                wait = 5 * 2 ** (attempt - 1)
+                LOGGER.info(
+                    "Retrying %s batched requests in %s seconds: %s",
+                    len(objects),
+                    wait,
+                    last_error,
+                )
+                sleep(wait)
+        raise last_error
+
     @classmethod
     def make_record(cls, record):
         record = cls.clean_url(record)
@@ -68,18 +187,16 @@ class Stream:
 
     @staticmethod
     def clean_url(record):
-        if record.get("media_url"):
-            record["media_url"] = remove_params_from_url(
-                record["media_url"], params=["_nc_sid", "_nc_cat", "ccb"]
-            )
-        if record.get("profile_picture_url"):
-            record["profile_picture_url"] = remove_params_from_url(
-                record["profile_picture_url"], params=[["_nc_sid", "_nc_cat", "ccb"]]
-            )
+        for key in CLEANABLE_URL_KEYS:
+            url = record.get(key)
+            if url:
+                record[key] = remove_params_from_url(url, params=URL_TRACKING_PARAMS)
         return record
 
 
 class IncrementalStream(Stream):
+    __slots__ = ("_state",)
+
     def __init__(self, state, **kwargs):
         super().__init__(**kwargs)
         self._state = state or {}
@@ -93,7 +210,26 @@ class IncrementalStream(Stream):
             return None
 
         LOGGER.info("Found bookmark for stream %s: %s", self.name, current_bookmark)
-        return pendulum.parse(current_bookmark)
+        return self._parse_bookmark(current_bookmark)
+
+    @staticmethod
+    def _parse_bookmark(bookmark):
+        """Parse a bookmark string, preferring the stdlib fast path.
+
+        Bookmarks are written by this tap as 'YYYY-MM-DD HH:MM:SS', which
+        datetime.fromisoformat handles directly; anything fancier falls back
+        to pendulum.parse. Naive values get UTC attached, matching what
+        pendulum.parse assumes. The result is always a pendulum instance:
+        callers format it with pendulum-only methods like
+        to_datetime_string().
+        """
+        try:
+            parsed = datetime.fromisoformat(bookmark.replace("Z", "+00:00"))
+        except ValueError:
+            return pendulum.parse(bookmark)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return pendulum.instance(parsed)
 
 
 class Users(Stream):
@@ -102,35 +238,49 @@ class Users(Stream):
     track history.
     """
 
+    __slots__ = ()
+
     base_properties = {"page_id"}
 
     def __iter__(self):
-        for account in self._api.accounts:
+        def fetch(account):
             ig_account = account["instagram_business_account"]
             record = ig_account.api_get(fields=self.fields()).export_all_data()
             record["page_id"] = account["page_id"]
-            yield self.make_record(record)
+            yield record
+
+        for records in self.for_each_account(fetch):
+            for record in records:
+                yield self.make_record(record)
 
 
 class UserLifetimeInsights(Stream):
+    __slots__ = ()
+
     base_properties = {"page_id", "business_account_id", "metric", "date", "value"}
     key_properties = ["business_account_id", "metric", "date"]
     period = [InstagramInsightsResult.Period.lifetime]
     metrics = ["audience_city", "audience_country", "audience_gender_age", "audience_locale"]
 
     def __iter__(self):
-        for account in self._api.accounts:
+        params = self.request_params()
+
+        def fetch(account):
             ig_account = account["instagram_business_account"]
-            for metric in ig_account.get_insights(params=self.request_params()):
-                yield self.make_record(
-                    {
-                        "page_id": account["page_id"],
-                        "business_account_id": ig_account.get("id"),
-                        "metric": metric["name"],
-                        "date": metric["values"][0]["end_time"],
-                        "value": metric["values"][0]["value"],
-                    }
-                )
+            page_id = account["page_id"]
+            account_id = ig_account.get("id")
+            for metric in ig_account.get_insights(params=params):
+                yield {
+                    "page_id": page_id,
+                    "business_account_id": account_id,
+                    "metric": metric["name"],
+                    "date": metric["values"][0]["end_time"],
+                    "value": metric["values"][0]["value"],
+                }
+
+        for records in self.for_each_account(fetch):
+            for record in records:
+                yield self.make_record(record)
 
     def request_params(self):
         params = super().request_params()
@@ -139,6 +289,8 @@ class UserLifetimeInsights(Stream):
 
 
 class UserInsights(IncrementalStream):
+    __slots__ = ("_range",)
+
     base_properties = {"page_id", "business_account_id"}
     key_properties = ["business_account_id", "date"]
     bookmark_key = "date"
@@ -161,9 +313,16 @@ class UserInsights(IncrementalStream):
         InstagramInsightsResult.Period.lifetime: ["online_followers"],
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._range = None
+
     def build_range(self):
+        if self._range is not None:
+            return self._range
         start_date = self._get_bookmark()
-        min_start_date = pendulum.today().subtract(days=self.buffer_days)
+        today = pendulum.today()
+        min_start_date = today.subtract(days=self.buffer_days)
         if start_date is not None:
             if start_date < min_start_date:
                 LOGGER.warning(
@@ -176,8 +335,9 @@ class UserInsights(IncrementalStream):
             LOGGER.info("Get insight data since %s days ago until now", self.buffer_days)
             start_date = min_start_date
         # Instagram data can be delayed up to 48 hours and is calculated at 7:00 or 8:00 AM daily
-        end_date = pendulum.today(-1)
-        return min(start_date, end_date), end_date
+        end_date = today.subtract(days=1)
+        self._range = (min(start_date, end_date), end_date)
+        return self._range
 
     def request_params(self):
         params = super().request_params()
@@ -189,32 +349,47 @@ class UserInsights(IncrementalStream):
     def __iter__(self):
         base_params = self.request_params()
 
-        for account in self._api.accounts:
+        # Periods sharing a metric list (week/days_28) are fetched in one call;
+        # the response tags each result with its period
+        periods_by_metrics = defaultdict(list)
+        for period, metrics in self.period_to_metrics.items():
+            periods_by_metrics[tuple(metrics)].append(period)
+
+        def fetch(account):
             ig_account = account["instagram_business_account"]
 
-            metrics_by_day = {}
-            for period, metrics in self.period_to_metrics.items():
-                params = {**base_params, "period": [period], "metric": metrics}
+            metrics_by_day = defaultdict(dict)
+            for metrics, periods in periods_by_metrics.items():
+                params = {**base_params, "period": periods, "metric": list(metrics)}
                 insights = ig_account.get_insights(params=params)
                 for metric in insights:
                     key = metric["name"]
-                    if period in ["week", "days_28"]:
-                        key += "_{}".format(period)
+                    if metric["period"] in ["week", "days_28"]:
+                        key += "_{}".format(metric["period"])
                     for value in metric["values"]:
-                        end_time = value["end_time"]
-
-                        if end_time not in metrics_by_day:
-                            metrics_by_day[end_time] = {}
-                        metrics_by_day[end_time][key] = value["value"]
+                        metrics_by_day[value["end_time"]][key] = value["value"]
 
+            page_id = account["page_id"]
+            account_id = ig_account.get("id")
             for end_time in sorted(metrics_by_day):
-                record = {
-                    **metrics_by_day[end_time],
-                    "page_id": account["page_id"],
-                    "business_account_id": ig_account.get("id"),
-                }
+                # Reuse the merged per-day dict as the record instead of copying it
+                record = metrics_by_day[end_time]
+                record["page_id"] = page_id
+                record["business_account_id"] = account_id
                 record[self.bookmark_key] = end_time
+                yield record
+
+        accounts_left = len(self._api.accounts)
+        for records in self.for_each_account(fetch):
+            for record in records:
                 yield self.make_record(record)
+            # Emit state between accounts so targets can flush what they have.
+            # The bookmark itself only advances at the end: all accounts share
+            # one (since, until) window, so moving it earlier would skip days
+            # for accounts that have not been emitted yet.
+            accounts_left -= 1
+            if accounts_left:
+                yield self.make_state(self._state)
 
         yield self.make_state(
             singer.write_bookmark(self._state, self.name, self.bookmark_key, base_params["until"])
@@ -228,6 +403,8 @@ class Media(Stream):
     No primary key for this stream to allow tracking history.
     """
 
+    __slots__ = ("_children_fields",)
+
     base_properties = {"page_id", "business_account_id"}
     invalid_children_fields = [
         "caption",
@@ -237,36 +414,87 @@ class Media(Stream):
         "children",
     ]
 
+    # Graph ?ids= requests accept up to 50 object ids
+    ids_per_request = 50
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._children_fields = None
+
+    def children_fields(self):
+        """Requestable fields for carousel children; computed once per instance"""
+        if self._children_fields is None:
+            self._children_fields = ",".join(
+                set(self.fields()).difference(self.invalid_children_fields)
+            )
+        return self._children_fields
+
     def __iter__(self):
         params = self.request_params()
+        LOGGER.debug("Media fields: %s", self.fields())
 
-        for account in self._api.accounts:
+        def fetch(account):
             ig_account = account["instagram_business_account"]
-            LOGGER.info(self.fields())
+            page_id = account["page_id"]
+            account_id = ig_account.get("id")
             media = ig_account.get_media(params=params, fields=self.fields())
 
             for row in media:
                 record = row.export_all_data()
                 if record.get("children"):
-                    record["children"] = [
-                        self.get_child(child["id"]) for child in record["children"]["data"]
-                    ]
+                    record["children"] = self.get_children(
+                        [child["id"] for child in record["children"]["data"]]
+                    )
 
-                record.update(
-                    {"page_id": account["page_id"], "business_account_id": ig_account.get("id")}
-                )
+                record.update({"page_id": page_id, "business_account_id": account_id})
+                yield record
+
+        for records in self.for_each_account(fetch):
+            for record in records:
                 yield self.make_record(record)
 
-    def get_child(self, child_id):
-        fields = list(set(self.fields()).difference(set(self.invalid_children_fields)))
-        media_obj = IGMedia(child_id)
-        record = media_obj.api_get(fields=fields).export_all_data()
-        return record
+    def get_children(self, child_ids):
+        """Fetch carousel children in bulk via the ?ids= multi-object endpoint.
+
+        One request covers up to ids_per_request children instead of one
+        api_get round-trip per child.
+        """
+        fields = self.children_fields()
+        children_by_id = {}
+        missing = []
+        with _CHILD_MEDIA_CACHE_LOCK:
+            for child_id in child_ids:
+                cached = _CHILD_MEDIA_CACHE.get((child_id, fields))
+                if cached is None:
+                    missing.append(child_id)
+                else:
+                    _CHILD_MEDIA_CACHE.move_to_end((child_id, fields))
+                    children_by_id[child_id] = cached
+
+        for offset in range(0, len(missing), self.ids_per_request):
+            chunk = missing[offset : offset + self.ids_per_request]
+            response = self._api.api.call(
+                "GET",
+                ("",),
+                params={"ids": ",".join(chunk), "fields": fields},
+            )
+            fetched = response.json()
+            children_by_id.update(fetched)
+            with _CHILD_MEDIA_CACHE_LOCK:
+                for child_id, record in fetched.items():
+                    _CHILD_MEDIA_CACHE[(child_id, fields)] = record
+                    if len(_CHILD_MEDIA_CACHE) > _CHILD_MEDIA_CACHE_SIZE:
+                        _CHILD_MEDIA_CACHE.popitem(last=False)
+
+        return [children_by_id[child_id] for child_id in child_ids if child_id in children_by_id]
 
 
 class MediaInsights(Stream):
+    __slots__ = ()
+
     base_properties = {"id", "page_id", "business_account_id"}
     metrics = ["engagement", "impressions", "reach", "saved"]
+    video_metrics = metrics + ["video_views"]
     carousel_album_metrics = [
         "carousel_album_engagement",
         "carousel_album_impressions",
@@ -275,40 +503,98 @@ class MediaInsights(Stream):
         "carousel_album_video_views",
     ]
 
+    # Graph batch requests take up to 50 sub-requests
+    batch_size = 50
+
     def __iter__(self):
         params = self.request_params()
 
-        for account in self._api.accounts:
+        def fetch(account):
             ig_account = account["instagram_business_account"]
+            page_id = account["page_id"]
             account_id = ig_account.get("id")
-            media = ig_account.get_media(params=params, fields=["media_type"])
-            for ig_media in media:
-                insights = self.get_insights(ig_media, account_id)
-                if insights is None:
+            media = iter(ig_account.get_media(params=params, fields=["media_type"]))
+            while True:
+                chunk = list(islice(media, self.batch_size))
+                if not chunk:
+                    break
+                insights_by_media, cutoff = self.get_insights_batched(chunk, account_id)
+                for ig_media in chunk[:cutoff]:
+                    insights = insights_by_media.get(ig_media["id"])
+                    if insights is None:
+                        continue
+
+                    insights.update(
+                        {
+                            "id": ig_media["id"],
+                            "page_id": page_id,
+                            "business_account_id": account_id,
+                        }
+                    )
+                    yield insights
+                if cutoff < len(chunk):
+                    # Media arrive newest first, so older pages can only repeat
+                    # the converted-account error; stop paginating as well
                     break
 
-                insights.update(
-                    {
-                        "id": ig_media["id"],
-                        "page_id": account["page_id"],
-                        "business_account_id": account_id,
-                    }
-                )
-                yield self.make_record(insights)
+        for records in self.for_each_account(fetch):
+            for record in records:
+                yield self.make_record(record)
 
-    def get_insights(self, ig_media: IGMedia, account_id):
-        media_type = ig_media.get("media_type")
+    def metrics_for(self, media_type):
+        """Metric list valid for a media type; precomputed at class level"""
         if media_type == "VIDEO":
-            metrics = self.metrics + ["video_views"]
-        elif media_type == "CAROUSEL_ALBUM":
-            metrics = self.carousel_album_metrics
-        else:
-            metrics = self.metrics
+            return self.video_metrics
+        if media_type == "CAROUSEL_ALBUM":
+            return self.carousel_album_metrics
+        return self.metrics
+
+    def get_insights_batched(self, media, account_id):
+        """Fetch insights for a slice of media via Graph batch requests, keyed by media id.
+
+        Each sub-request asks only for the metrics valid for that media's type.
+        Returns the insights plus a cutoff index: media at or after the first
+        converted-account error are excluded, and the caller stops consuming
+        the media cursor, mirroring the old early break.
+        """
+        insights_by_media = {}
+        failed_indexes = []
+        cutoff = len(media)
+
+        def add_request(item, batch, retry):
+            self._add_insights_request(
+                item, account_id, batch, insights_by_media, failed_indexes, retry
+            )
 
-        try:
-            insights = ig_media.get_insights(params={"metric": metrics})
-            return {record.get("name"): record.get("values")[0]["value"] for record in insights}
-        except FacebookRequestError as error:
+        for offset in range(0, len(media), self.batch_size):
+            chunk = list(enumerate(media[offset : offset + self.batch_size], offset))
+            self.execute_batch(chunk, add_request)
+            if failed_indexes:
+                # We receive all Media starting from the last one, and if on the next Media
+                # we get an Insight error, then no reason to make inquiries for each Media further,
+                #  since they were published even earlier.
+                cutoff = min(failed_indexes)
+                break
+        return insights_by_media, cutoff
+
+    def _add_insights_request(
+        self, item, account_id, batch, insights_by_media, failed_indexes, retry
+    ):
+        index, ig_media = item
+
+        def on_success(response):
+            data = response.json().get("data", [])
+            insights_by_media[ig_media["id"]] = {
+                record.get("name"): record.get("values")[0]["value"] for record in data
+            }
+
+        def on_failure(response):
+            error = response.error()
+            # Throttle/transient sub-responses get the same retry treatment
+            # the backoff policy gives single calls
+            if error.api_error_code() in RATE_LIMIT_CODES or error.api_transient_error():
+                retry(item, error)
+                return
             # An error might occur if the media was posted before the most recent time that
             # the user's account was converted to a business account from a personal account
             if error.api_error_subcode() == 2108006:
@@ -317,63 +603,140 @@ class MediaInsights(Stream):
                     or error.api_error_message()
                 )
                 LOGGER.error("Insights error for business_account_id %s: %s", account_id, details)
-                # We receive all Media starting from the last one, and if on the next Media
-                # we get an Insight error, then no reason to make inquiries for each Media further,
-                #  since they were published even earlier.
-                return None
+                failed_indexes.append(index)
+                return
             raise error
 
+        ig_media.get_insights(
+            params={"metric": self.metrics_for(ig_media.get("media_type"))},
+            batch=batch,
+            success=on_success,
+            failure=on_failure,
+        )
+
+
+def take_active_stories(stories, cutoff):
+    """Stop consuming story pagination once a story is older than the 24h lifetime.
+
+    Stories expire after 24 hours, so anything beyond the cutoff (and every
+    page after it) can only be stale; breaking avoids fetching those pages.
+    """
+    for story in stories:
+        timestamp = story.get("timestamp")
+        if timestamp and pendulum.parse(timestamp) < cutoff:
+            break
+        yield story
+
 
 class Stories(Stream):
+    __slots__ = ()
+
     base_properties = {"page_id", "business_account_id"}
 
     def __iter__(self):
         params = self.request_params()
+        cutoff = pendulum.now().subtract(hours=24)
+        # timestamp is always requested for the cutoff check; only emit it
+        # when it is actually selected
+        strip_timestamp = "timestamp" not in self.fields()
 
-        for account in self._api.accounts:
+        def fetch(account):
             ig_account = account["instagram_business_account"]
-            stories = ig_account.get_stories(params=params, fields=self.fields())
-            LOGGER.info("Num stories: %s", len(stories))
-            for story in stories:
+            page_id = account["page_id"]
+            account_id = ig_account.get("id")
+            stories = ig_account.get_stories(params=params, fields=self.fields() | {"timestamp"})
+            count = 0
+            for story in take_active_stories(stories, cutoff):
                 record = story.export_all_data()
-                record.update(
-                    {"page_id": account["page_id"], "business_account_id": ig_account.get("id")}
-                )
+                if strip_timestamp:
+                    record.pop("timestamp", None)
+                record.update({"page_id": page_id, "business_account_id": account_id})
+                count += 1
+                yield record
+            LOGGER.info("Num stories: %s", count)
+
+        for records in self.for_each_account(fetch):
+            for record in records:
                 yield self.make_record(record)
 
 
 class StoryInsights(Stream):
+    __slots__ = ()
+
     base_properties = {"page_id", "business_account_id"}
     metrics = ["exits", "impressions", "reach", "replies", "taps_forward", "taps_back"]
 
+    # Graph batch requests take up to 50 sub-requests
+    batch_size = 50
+
     def __iter__(self):
         params = self.request_params()
+        cutoff = pendulum.now().subtract(hours=24)
 
-        for account in self._api.accounts:
+        def fetch(account):
             ig_account = account["instagram_business_account"]
-            stories = ig_account.get_stories(params=params, fields=[])
+            page_id = account["page_id"]
+            account_id = ig_account.get("id")
+            stories = list(
+                take_active_stories(
+                    ig_account.get_stories(params=params, fields=["timestamp"]), cutoff
+                )
+            )
+            insights_by_story = self.get_insights_batched(stories)
             for story in stories:
-                insights = self.get_insights(story)
+                insights = insights_by_story.get(story["id"])
                 if not insights:
                     continue
 
                 insights.update(
                     {
                         "id": story["id"],
-                        "page_id": account["page_id"],
-                        "business_account_id": ig_account.get("id"),
+                        "page_id": page_id,
+                        "business_account_id": account_id,
                     }
                 )
-                yield self.make_record(insights)
+                yield insights
 
-    def get_insights(self, story: IGMedia) -> dict:
-        # Story IG Media object metrics with values less than 5 will return an error code 10
-        # with the message (#10) Not enough viewers for the media to show insights.
-        try:
-            insights = story.get_insights(params={"metric": self.metrics})
-            return {record["name"]: record["values"][0]["value"] for record in insights}
-        except FacebookRequestError as error:
+        for records in self.for_each_account(fetch):
+            for record in records:
+                yield self.make_record(record)
+
+    def get_insights_batched(self, stories) -> dict:
+        """Fetch insights for all stories via Graph batch requests, keyed by story id.
+
+        One batched round-trip covers up to batch_size stories instead of one
+        HTTP request per story.
+        """
+        insights_by_story = {}
+
+        def add_request(story, batch, retry):
+            self._add_insights_request(story, batch, insights_by_story, retry)
+
+        for offset in range(0, len(stories), self.batch_size):
+            self.execute_batch(stories[offset : offset + self.batch_size], add_request)
+        return insights_by_story
+
+    def _add_insights_request(self, story: IGMedia, batch, insights_by_story, retry):
+        def on_success(response):
+            data = response.json().get("data", [])
+            insights_by_story[story["id"]] = {
+                record["name"]: record["values"][0]["value"] for record in data
+            }
+
+        def on_failure(response):
+            error = response.error()
+            # Throttle/transient sub-responses get the same retry treatment
+            # the backoff policy gives single calls
+            if error.api_error_code() in RATE_LIMIT_CODES or error.api_transient_error():
+                retry(story, error)
+                return
+            # Story IG Media object metrics with values less than 5 will return an error code 10
+            # with the message (#10) Not enough viewers for the media to show insights.
             if error.api_error_code() == 10:
                 LOGGER.error("Insights error: %s", error.api_error_message())
-                return {}
+                return
             raise error
+
+        story.get_insights(
+            params={"metric": self.metrics}, batch=batch, success=on_success, failure=on_failure
+        )